@@ -11,48 +11,143 @@ Integrates with Driver Safety Suite to provide:
 
 Requirements:
 - Ollama with mistral model installed
-- Python packages: speech_recognition, gtts, pygame, flask, requests, numpy, etc.
+- Python packages: speech_recognition, gtts, pygame, flask, waitress, requests, numpy, orjson,
+  webrtcvad, openwakeword, faster_whisper, etc.
+- Optional: a custom openWakeWord model for "gogi" at models/gogi.onnx
+  (without it each listen window is transcribed with faster-whisper instead),
+  plus command models listed in COMMAND_KEYWORD_MODELS. openWakeWord also needs
+  its shared feature models, fetched once with:
+      python -c "import openwakeword.utils; openwakeword.utils.download_models()"
 """
 
+import io
 import os
+import sys
 import time
-import json
+import re
 import queue
+import hashlib
 import random
+import atexit
+import signal
+import logging
 import threading
 import subprocess
+from collections import deque, OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import orjson
 import sounddevice as sd
 import speech_recognition as sr
+import webrtcvad
+from openwakeword.model import Model as WakeWordModel
+from faster_whisper import WhisperModel
 import requests
-import tempfile
+from requests.adapters import HTTPAdapter
 from gtts import gTTS
 import pygame
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Blueprint, Response, request, send_from_directory, stream_with_context
+from waitress import serve
 
 global_mic_active = True
 
 # -------------------- CONFIGURATION --------------------
 # Voice recognition settings
 WAKE_WORD = "gogi"
+WAKE_RE = re.compile(rf'\b(?:hey |ok )?{re.escape(WAKE_WORD)}\b', re.IGNORECASE)
 LISTENING_TIMEOUT = 10  # seconds to listen for command after wake word
 SAMPLE_RATE = 16000
-BLOCK_SIZE = 8000  # 0.5s at 16kHz
+BLOCK_SIZE = 480  # 30ms at 16kHz
+MIC_BUFFER_SECONDS = 15  # Audio kept while the listener is busy; older blocks are dropped
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+WAKE_WORD_MODEL = os.path.join(MODELS_DIR, "gogi.onnx")
+# Optional openWakeWord models for fixed commands, keyed by COMMAND_RE intent;
+# spotted right after the wake word so these commands skip speech-to-text
+COMMAND_KEYWORD_MODELS = {
+    "stop": os.path.join(MODELS_DIR, "stop_listening.onnx"),
+    "calm": os.path.join(MODELS_DIR, "play_calm_music.onnx"),
+    "weather": os.path.join(MODELS_DIR, "weather.onnx"),
+    "distance": os.path.join(MODELS_DIR, "distance.onnx"),
+    "music": os.path.join(MODELS_DIR, "music.onnx"),
+}
+WAKE_WORD_THRESHOLD = 0.5  # openWakeWord score needed to trigger
+VAD_AGGRESSIVENESS = 3  # webrtcvad mode, 0 (lenient) to 3 (strict)
+STT_MODEL = "tiny.en"  # faster-whisper model used for on-device speech-to-text
+SILENCE_RMS = 0.01  # Captured audio quieter than this (full scale = 1.0) is not transcribed
 
 # Ollama settings
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_HOST = "http://localhost:11434"
+OLLAMA_URL = f"{OLLAMA_HOST}/api/generate"
+OLLAMA_TIMEOUT = (2.0, 60.0)  # (connect, read) seconds
+OLLAMA_PROBE_TIMEOUT = 2.0  # Startup model check must not hold up the assistant
 MODEL_NAME = "mistral"
+ASSIST_MAX_TOKENS = 30  # Safety suggestions are one line; stop decoding early
+ASSIST_STOP = ["\n"]
+ASSIST_CACHE_SIZE = 256  # Safety suggestions remembered per distinct prompt
+ASSIST_CACHE_TTL = 300  # Seconds before a remembered suggestion is regenerated
+OLLAMA_ERROR_REPLY = "Sorry, I'm having trouble thinking right now."
+OLLAMA_UNAVAILABLE_REPLY = "Sorry, I can't access my thinking capabilities at the moment."
+# System prompt for free-form driver questions
+SYSTEM_PROMPT = """
+You are an AI driving assistant. You should:
+1. Provide helpful, concise responses to the driver's queries
+2. Prioritize the driver's safety above all else
+3. Suggest actions that keep the driver's attention on the road
+4. Keep responses brief (1-3 sentences when possible)
+"""
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+|\n+')  # Split streamed responses into sentences/lines for TTS
 
 # TTS settings
 TTS_LANG = 'en'  # Language for Google TTS
+TTS_TIMEOUT = 5.0  # Seconds before a Google TTS request is abandoned
+SHUTDOWN_SPEECH_TIMEOUT = 5.0  # Longest main() waits for the goodbye phrase to play
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Prune least recently used clips above this size
 
 # Safety thresholds for intervention
 CONSECUTIVE_ALERTS_THRESHOLD = 2  # Number of alerts before intervention
 ALERT_WINDOW = 300  # Consider alerts within this many seconds (5 minutes)
+ALERT_TTS_COOLDOWN = 20  # Minimum seconds between spoken warnings of the same type
+ALERT_DEDUP_WINDOW = 1  # Repeats of the latest alert type within this many seconds are not logged again
+MONITOR_INTERVAL = 5  # Seconds between continuous-monitoring checks
+
+# Prompt for proactive safety suggestions, filled in by get_driver_assistance_prompt()
+ASSIST_PROMPT_TEMPLATE = """
+    BE EXTREMELY SHORT IN YOUR RESPONSES. GIVE 1 line answer
+    As a driving assistant, I need to help a driver who is showing {alerts}.
+    The driver has had {count} safety alerts in the past {minutes} minutes.
+    Current steering direction: {steer}
+
+    Provide a brief, helpful suggestion that is:
+    1. Calming and supportive in tone
+    2. Safety-focused without being judgmental
+    3. Actionable (something the driver can do immediately)
+    4. Brief (under 20 words if possible)
+    """
 
 # Communication settings
-FLASK_PORT = 8080  # Port for API server to receive alerts
-DASHBOARD_PORT = 8081  # Port for dashboard UI
+FLASK_PORT = 8080  # Port for the alert API and the dashboard UI (under /dashboard)
+SERVER_THREADS = 8  # Concurrent requests; each open dashboard holds one for its event stream
+MAX_EVENT_STREAMS = 4  # Dashboard streams allowed at once, so /alert always has free threads
+
+# Scheduling (Linux only; ignored where unsupported or the cores don't exist)
+AUDIO_CPUS = {0, 1}  # Cores for mic capture, wake-word spotting and playback
+WORKER_CPUS = {2, 3}  # Cores for LLM streaming, alerts, the web server and the STT/TTS pools
+AUDIO_NICE = -5  # Niceness for audio threads; raising priority needs CAP_SYS_NICE
+
+# Voice commands: one regex pass picks the intent from the named group that matched
+COMMAND_RE = re.compile(
+    r"(?P<calm>play.*(?:calm|relaxing|music))"
+    r"|(?P<stop>stop.*listening)"
+    r"|(?P<weather>weather)"
+    r"|(?P<distance>distance)"
+    r"|(?P<music>music)"
+)
+COMMAND_RESPONSES = {
+    "weather": "Currently 36 degrees Celcius in okhla new delhi with sunny skies, expected to hit 40 degrees celcius at peak.",
+    "distance": "You are about 20 kilometers far from your destination, estimated time remaining is 45 minutes",
+    "music": "Now playing on spotify",
+}
 
 # Music/audio resources
 CALM_MUSIC_OPTIONS = [
@@ -61,17 +156,87 @@ CALM_MUSIC_OPTIONS = [
     "nature_sounds_3.mp3",
 ]
 
+# Log output also goes to this file
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sheero.log")
+
 # Directory for static files
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 os.makedirs(STATIC_DIR, exist_ok=True)
 
+# Synthesized speech is cached here, keyed by language and text
+TTS_CACHE_DIR = os.path.join(STATIC_DIR, "tts_cache")
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+
+# Spoken immediately when the Driver Safety Suite raises an alert
+ALERT_PHRASES = {
+    "DROWSY": "You seem a bit drowsy. Maybe pull over and rest.",
+    "DRUNK": "You seem impaired. Consider stopping driving.",
+    "STRESS": "You seem stressed. Take a moment to relax before continuing.",
+    "CRASH": "I've detected a possible collision. Are you okay? Please respond or I'll call emergency services.",
+}
+
+# Fixed phrases synthesized and decoded at startup so they play without TTS or mp3 decoding
+CANNED_PHRASES = [
+    "How can I help you?",
+    "Sorry, I didn't catch that.",
+    "Speech service is unavailable right now.",
+    "Assistant shutting down. Drive safely.",
+    *ALERT_PHRASES.values(),
+    *COMMAND_RESPONSES.values(),
+]
+
 # -------------------- GLOBALS --------------------
+class AlertLog:
+    """Time-ordered alert history kept as parallel NumPy arrays of timestamps and type codes"""
+    TYPES = ("DROWSY", "DRUNK", "STRESS")
+
+    def __init__(self, capacity=1024):
+        self.ts = np.empty(capacity, dtype=np.float64)
+        self.type = np.empty(capacity, dtype=np.uint8)
+        self.n = 0
+        self.lock = threading.Lock()  # Flask request threads append while alert_monitor prunes
+
+    def __len__(self):
+        return self.n
+
+    def append(self, timestamp, alert_type):
+        """Record an alert, doubling the arrays when full"""
+        with self.lock:
+            if self.n == len(self.ts):
+                self.ts = np.concatenate([self.ts, np.empty_like(self.ts)])
+                self.type = np.concatenate([self.type, np.empty_like(self.type)])
+            self.ts[self.n] = timestamp
+            self.type[self.n] = self.TYPES.index(alert_type)
+            self.n += 1
+
+    def last(self):
+        """Return the newest (timestamp, alert_type), or None if empty"""
+        with self.lock:
+            if not self.n:
+                return None
+            return float(self.ts[self.n - 1]), self.TYPES[self.type[self.n - 1]]
+
+    def count_within(self, window, now):
+        """Count alerts newer than `window` seconds"""
+        with self.lock:
+            return int(np.count_nonzero(self.ts[:self.n] > now - window))
+
+    def prune(self, now):
+        """Drop alerts older than ALERT_WINDOW"""
+        with self.lock:
+            idx = int(np.searchsorted(self.ts[:self.n], now - ALERT_WINDOW, side="right"))
+            if idx:
+                remaining = self.n - idx
+                self.ts[:remaining] = self.ts[idx:self.n]
+                self.type[:remaining] = self.type[idx:self.n]
+                self.n = remaining
+
 driver_state = {
     "DROWSY": False,
     "DRUNK": False,
     "STRESS": False,
     "STEER": "STRAIGHT",
-    "last_alerts": [],  # List of (timestamp, alert_type) tuples
+    "last_alerts": AlertLog(),  # Recent safety alerts
     "continuous_monitoring": True,
     "last_suggestion": 0,  # Timestamp of last suggestion
     "suggestion_cooldown": 60,  # Seconds between suggestions
@@ -80,62 +245,234 @@ driver_state = {
     "assistant_state": "standby"  # New: tracks assistant visual state
 }
 
-speech_queue = queue.Queue()  # Commands detected by speech recognition
-tts_queue = queue.Queue()     # Text to be spoken
-alert_queue = queue.Queue()   # Safety alerts from main program
+class DedupQueue(queue.Queue):
+    """Bounded FIFO that ignores items already pending and drops the oldest item when full
 
-# Create Flask apps for API and Dashboard
-api_app = Flask("api")
-dashboard_app = Flask("dashboard", 
-                     static_folder=STATIC_DIR,
-                     template_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+    Unlike queue.Queue(maxsize), put() never blocks: on a long drive it is
+    better to lose a stale utterance than to stall the producer. Items for
+    which keep(item) is true are never dropped, and on_drop(item) is called
+    for every item that will not be returned by get().
+    """
+    def __init__(self, limit, key=None, keep=None, on_drop=None):
+        self.limit = limit
+        self.key = key or (lambda item: item)
+        self.keep = keep or (lambda item: False)
+        self.on_drop = on_drop or (lambda item: None)
+        super().__init__()
+
+    def _init(self, maxsize):
+        self.queue = deque()
+        self.pending = {}  # key -> queued item
+
+    def put(self, item, block=True, timeout=None):
+        """Queue item and return it, or return the matching item already pending"""
+        dropped = None
+        with self.mutex:
+            item_key = self.key(item)
+            if item_key in self.pending:
+                dropped, item = item, self.pending[item_key]
+            else:
+                if len(self.queue) >= self.limit:
+                    dropped = next((queued for queued in self.queue if not self.keep(queued)), None)
+                    if dropped is not None:
+                        self.queue.remove(dropped)
+                        del self.pending[self.key(dropped)]
+                        self.unfinished_tasks -= 1
+                    elif not self.keep(item):
+                        dropped = item
+                if dropped is not item:
+                    self.queue.append(item)
+                    self.pending[item_key] = item
+                    self.unfinished_tasks += 1
+                    self.not_empty.notify()
+        if dropped is not None:
+            self.on_drop(dropped)
+        return item
+
+    def _get(self):
+        item = self.queue.popleft()
+        del self.pending[self.key(item)]
+        return item
+
+def drop_utterance(item):
+    """Release a tts_queue item that will never be played"""
+    text, audio_future, played = item
+    audio_future.cancel()
+    played.set()
+
+speech_queue = DedupQueue(4)  # Commands detected by speech recognition
+# (text, synthesis future, played event) to be spoken in order; safety warnings are never dropped
+tts_queue = DedupQueue(16, key=lambda item: item[0],
+                       keep=lambda item: item[0] in ALERT_PHRASES.values(), on_drop=drop_utterance)
+alert_queue = DedupQueue(16)  # Safety alerts from main program
+last_alert_spoken = {"DROWSY": 0, "DRUNK": 0, "STRESS": 0}  # Timestamp of last spoken warning per type
+
+# On-device speech-to-text (int8 CTranslate2 weights)
+stt_model = WhisperModel(STT_MODEL, device="cpu", compute_type="int8")
+
+def pin_thread(tid, cpus, nice=None):
+    """Restrict native thread tid to cpus and set its niceness (default: the process's) where the OS allows"""
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    # The main thread is never pinned, so it holds the process-wide core set and niceness;
+    # new threads inherit both from their creator, so never read them from the caller
+    cpus = cpus & os.sched_getaffinity(os.getpid())
+    if nice is None:
+        nice = os.getpriority(os.PRIO_PROCESS, os.getpid())
+    try:
+        if cpus:
+            os.sched_setaffinity(tid, cpus)
+        os.setpriority(os.PRIO_PROCESS, tid, nice)
+    except OSError as e:
+        log(f"Could not tune scheduling for thread {tid}: {e}")
+
+def pin_pool_thread():
+    """Executor initializer: keep pool threads on WORKER_CPUS at normal priority"""
+    pin_thread(threading.get_native_id(), WORKER_CPUS)
+
+# Upcoming sentences are synthesized while the current one plays
+tts_pool = ThreadPoolExecutor(max_workers=3, initializer=pin_pool_thread)
+tts_cache_lock = threading.Lock()  # Serializes TTS cache size accounting and pruning
+tts_cache_bytes = None  # Bytes in TTS_CACHE_DIR, counted on first store_tts_cache()
+
+# Speech is transcribed off the listening thread; commands get their own
+# worker so they never wait behind wake-word windows
+stt_pool = ThreadPoolExecutor(max_workers=1, initializer=pin_pool_thread)
+command_stt_pool = ThreadPoolExecutor(max_workers=1, initializer=pin_pool_thread)
+wake_event = threading.Event()  # Set when a transcript contains WAKE_WORD
+shutdown = threading.Event()  # Set by SIGTERM to stop main()
+
+# Recent safety suggestions, (prompt, system_prompt) -> (monotonic time, sentences), oldest first
+assist_cache = OrderedDict()
+assist_cache_lock = threading.Lock()
+
+# Dashboard clients wait on this condition for state_version to change
+state_condition = threading.Condition()
+state_version = 0
+state_json = b"{}"  # Serialized get_state_payload(), rebuilt by broadcast_state()
+event_stream_slots = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+# Shared HTTP session so outbound requests reuse pooled keep-alive connections
+http_session = requests.Session()
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+atexit.register(http_session.close)
+
+# API and Dashboard blueprints, served together by one Flask app
+api_bp = Blueprint("api", __name__)
+dashboard_bp = Blueprint("dashboard", __name__)
 
 pygame.mixer.init()
+canned_sounds = {}  # CANNED_PHRASES text -> decoded pygame Sound, filled by prewarm_tts_cache()
 
 # Initialize websocket clients
 connected_clients = set()
 
+# Log records are queued and written by a listener thread, so audio threads never block on I/O
+log_formatter = logging.Formatter("[%(asctime)s] %(message)s", datefmt="%H:%M:%S")
+log_handlers = [logging.StreamHandler(sys.stdout), logging.FileHandler(LOG_FILE)]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_queue = queue.Queue()
+log_listener = QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+logger = logging.getLogger("sheero")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+
 # -------------------- HELPER FUNCTIONS --------------------
 def log(message):
-    """Print log message with timestamp"""
-    print(f"[{time.strftime('%H:%M:%S')}] {message}")
+    """Log message with timestamp without blocking the caller"""
+    logger.info(message)
 
-def query_ollama(prompt, system_prompt=None, temperature=0.7, max_tokens=500):
-    """Query the Ollama API with the given prompt"""
+def query_ollama_stream(prompt, system_prompt=None, temperature=0.7, max_tokens=40, stop=None):
+    """Query the Ollama API, yielding each sentence of the response as soon as it is generated"""
     headers = {"Content-Type": "application/json"}
     data = {
         "model": MODEL_NAME,
         "prompt": prompt,
-        "stream": False,
-        "temperature": temperature,
-        "max_tokens": max_tokens
+        "stream": True,
+        # Ollama reads sampling limits from "options"; top-level max_tokens is ignored
+        "options": {
+            "num_predict": max_tokens,
+            "temperature": temperature,
+        }
     }
+    if stop:
+        data["options"]["stop"] = stop
     if system_prompt:
         data["system"] = system_prompt
+    buf = ""
     try:
-        response = requests.post(OLLAMA_URL, headers=headers, json=data)
-        if response.status_code == 200:
-            return response.json().get("response", "")
-        else:
-            log(f"Error querying Ollama: {response.status_code} - {response.text}")
-            return "Sorry, I'm having trouble thinking right now."
+        with http_session.post(OLLAMA_URL, headers=headers, data=orjson.dumps(data),
+                               stream=True, timeout=OLLAMA_TIMEOUT) as response:
+            if response.status_code != 200:
+                log(f"Error querying Ollama: {response.status_code} - {response.text}")
+                yield OLLAMA_ERROR_REPLY
+                return
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                buf += chunk.get("response", "")
+                # Everything before the last sentence break is complete
+                *sentences, buf = SENTENCE_END_RE.split(buf)
+                for sentence in sentences:
+                    if sentence.strip():
+                        yield sentence.strip()
+                if chunk.get("done"):
+                    break
     except Exception as e:
         log(f"Exception when querying Ollama: {e}")
-        return "Sorry, I can't access my thinking capabilities at the moment."
+        yield OLLAMA_UNAVAILABLE_REPLY
+        return
+    if buf.strip():
+        yield buf.strip()
+
+def query_ollama_cached(prompt, system_prompt=None, **kwargs):
+    """Stream a response like query_ollama_stream, replaying recent answers to a repeated prompt"""
+    key = (prompt, system_prompt)
+    with assist_cache_lock:
+        entry = assist_cache.pop(key, None)
+        if entry and time.monotonic() - entry[0] < ASSIST_CACHE_TTL:
+            assist_cache[key] = entry  # Re-insert as most recently used
+            sentences = entry[1]
+        else:
+            sentences = None
+    if sentences is not None:
+        yield from sentences
+        return
+
+    sentences = []
+    for sentence in query_ollama_stream(prompt, system_prompt, **kwargs):
+        sentences.append(sentence)
+        yield sentence
+    if sentences and sentences[-1] not in (OLLAMA_ERROR_REPLY, OLLAMA_UNAVAILABLE_REPLY):
+        with assist_cache_lock:
+            assist_cache[key] = (time.monotonic(), sentences)
+            while len(assist_cache) > ASSIST_CACHE_SIZE:
+                assist_cache.popitem(last=False)
+
+def json_response(payload, status=200):
+    """Serialize payload with orjson into a Flask JSON response"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
 
 def speak(text):
-    """Add text to TTS queue"""
-    tts_queue.put(text)
+    """Start synthesizing text and queue it for in-order playback; returns an Event set once played"""
+    queued = tts_queue.put((text, tts_pool.submit(synthesize_speech, text), threading.Event()))
     set_assistant_state("speaking")
+    return queued[2]  # The already-pending item's event if text was queued twice
 
 def set_assistant_state(state):
     """Update assistant state and notify connected clients"""
     driver_state["assistant_state"] = state
     broadcast_state()
 
-def broadcast_state():
-    """Send current state to all connected dashboard clients"""
-    state_data = {
+def get_state_payload():
+    """Build the assistant state snapshot sent to the dashboard"""
+    return {
         "state": driver_state["assistant_state"],
         "alert": {
             "drowsy": driver_state["DROWSY"],
@@ -143,15 +480,22 @@ def broadcast_state():
             "stress": driver_state["STRESS"]
         }
     }
-    # Use requests to send to the dashboard's state endpoint
-    try:
-        requests.post(f"http://localhost:{DASHBOARD_PORT}/update_state", 
-                      json=state_data)
-    except Exception as e:
-        log(f"Error broadcasting state: {e}")
+
+def broadcast_state():
+    """Re-serialize the state snapshot and wake dashboard clients if it changed"""
+    global state_version, state_json
+    with state_condition:
+        payload = orjson.dumps(get_state_payload())
+        if payload == state_json:
+            return
+        state_json = payload
+        state_version += 1
+        state_condition.notify_all()
 
 def get_driver_assistance_prompt():
     """Generate a context-aware prompt for the LLM based on driver state"""
+    if not (driver_state["DROWSY"] or driver_state["DRUNK"] or driver_state["STRESS"]):
+        return None
     alerts = []
     if driver_state["DROWSY"]:
         alerts.append("drowsiness")
@@ -159,49 +503,122 @@ def get_driver_assistance_prompt():
         alerts.append("possible impairment or unwellness")
     if driver_state["STRESS"]:
         alerts.append("signs of stress")
-    recent_alerts_count = sum(1 for ts, _ in driver_state["last_alerts"]
-                              if time.time() - ts < ALERT_WINDOW)
-    if not alerts:
-        return None
-    context = f"""
-    BE EXTREMELY SHORT IN YOUR RESPONSES. GIVE 1 line answer
-    As a driving assistant, I need to help a driver who is showing {' and '.join(alerts)}.
-    The driver has had {recent_alerts_count} safety alerts in the past {ALERT_WINDOW//60} minutes.
-    Current steering direction: {driver_state['STEER']}
-
-    Provide a brief, helpful suggestion that is:
-    1. Calming and supportive in tone
-    2. Safety-focused without being judgmental
-    3. Actionable (something the driver can do immediately)
-    4. Brief (under 20 words if possible)
-    """
-    return context
+    return ASSIST_PROMPT_TEMPLATE.format_map({
+        "alerts": " and ".join(alerts),
+        "count": driver_state["last_alerts"].count_within(ALERT_WINDOW, time.time()),
+        "minutes": ALERT_WINDOW // 60,
+        "steer": driver_state["STEER"],
+    })
 
 def check_alert_threshold():
     """Check if we've hit threshold for intervention"""
     now = time.time()
-    driver_state["last_alerts"] = [
-        (ts, a) for ts, a in driver_state["last_alerts"] if now - ts < ALERT_WINDOW
-    ]
+    driver_state["last_alerts"].prune(now)
     recent_alerts = len(driver_state["last_alerts"])
     if now - driver_state["last_suggestion"] < driver_state["suggestion_cooldown"]:
         return False
     return recent_alerts >= CONSECUTIVE_ALERTS_THRESHOLD
 
+def play_sound(source):
+    """Play a Sound, path or file object and return when playback ends"""
+    sound = source if isinstance(source, pygame.mixer.Sound) else pygame.mixer.Sound(source)
+    channel = sound.play()
+    # Sleep once for the clip's length instead of polling get_busy() every 100ms
+    time.sleep(sound.get_length())
+    while channel.get_busy():
+        time.sleep(0.01)  # Mixer output latency past the nominal length
+
 def play_audio_file(filename):
     """Play an audio file using pygame"""
     try:
         if os.path.exists(filename):
-            pygame.mixer.music.load(filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            play_sound(filename)
             log(f"Played audio: {filename}")
         else:
             log(f"Audio file not found: {filename}")
     except Exception as e:
         log(f"Error playing audio: {e}")
 
+def tts_cache_path(text):
+    """Return the cache file path for the given text"""
+    key = hashlib.sha256(f"{TTS_LANG}:{text}".encode()).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, key + ".mp3")
+
+def synthesize_speech(text):
+    """Return audio for text: a decoded canned Sound, a cached mp3 path, or a fresh Google TTS buffer"""
+    if text in canned_sounds:
+        return canned_sounds[text]
+    path = tts_cache_path(text)
+    try:
+        # Refresh the timestamp so pruning treats this clip as recently used
+        os.utime(path)
+        return path
+    except OSError:
+        pass  # Not cached, or pruned since it was written
+    buf = io.BytesIO()
+    gTTS(text=text, lang=TTS_LANG, timeout=TTS_TIMEOUT).write_to_fp(buf)
+    store_tts_cache(path, buf.getvalue())
+    buf.seek(0)
+    return buf
+
+def store_tts_cache(path, data):
+    """Atomically write a synthesized clip into the cache"""
+    global tts_cache_bytes
+    partial = f"{path}.{threading.get_ident()}.part"
+    try:
+        with open(partial, "wb") as f:
+            f.write(data)
+        with tts_cache_lock:
+            if tts_cache_bytes is None:
+                tts_cache_bytes = sum(size for _, size, _ in tts_cache_entries())
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(partial, path)
+            tts_cache_bytes += len(data) - replaced
+            if tts_cache_bytes > TTS_CACHE_MAX_BYTES:
+                prune_tts_cache()
+    except OSError as e:
+        log(f"Error writing TTS cache: {e}")
+
+def tts_cache_entries():
+    """List (mtime, size, name) for each cached clip, skipping ones removed meanwhile"""
+    entries = []
+    for name in os.listdir(TTS_CACHE_DIR):
+        if name.endswith(".mp3"):
+            try:
+                stat = os.stat(os.path.join(TTS_CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    return entries
+
+def prune_tts_cache():
+    """Delete least recently used clips until the cache fits TTS_CACHE_MAX_BYTES (caller holds tts_cache_lock)"""
+    global tts_cache_bytes
+    entries = tts_cache_entries()
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= TTS_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(os.path.join(TTS_CACHE_DIR, name))
+            total -= size
+        except OSError as e:
+            log(f"Error pruning TTS cache: {e}")
+    tts_cache_bytes = total
+
+def prewarm_tts_cache():
+    """Synthesize and decode CANNED_PHRASES ahead of time"""
+    for phrase in CANNED_PHRASES:
+        try:
+            canned_sounds[phrase] = pygame.mixer.Sound(synthesize_speech(phrase))
+        except Exception as e:
+            log(f"Error pre-warming TTS cache: {e}")
+            return
+    log("TTS cache ready")
+
 def play_calm_music():
     """Select and play a calming music track"""
     music_file = random.choice(CALM_MUSIC_OPTIONS)
@@ -209,444 +626,436 @@ def play_calm_music():
     log(f"Would play music: {music_file}")
     # play_audio_file(music_file)
 
-# -------------------- CREATE DASHBOARD HTML --------------------
-def setup_dashboard_files():
-    """Create necessary files for dashboard UI"""
-    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"), exist_ok=True)
-    
-    # Create dashboard HTML file
-    dashboard_html = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Sheero - Car Dashboard AI Assistant</title>
-        <style>
-            body {
-                margin: 0;
-                padding: 0;
-                background-color: #0a0b0c;
-                color: #fff;
-                font-family: 'Arial', sans-serif;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                height: 100vh;
-                overflow: hidden;
-            }
-            
-            .dashboard-container {
-                width: 100%;
-                max-width: 800px;
-                position: relative;
-            }
-            
-            .assistant-container {
-                position: relative;
-                width: 320px;
-                height: 320px;
-                margin: 0 auto;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-            }
-            
-            .assistant-background {
-                position: absolute;
-                width: 100%;
-                height: 100%;
-                background: radial-gradient(circle, rgba(19,41,75,0.8) 0%, rgba(6,11,21,0.5) 100%);
-                border-radius: 50%;
-                box-shadow: 0 0 50px rgba(42, 95, 233, 0.3);
-                transition: box-shadow 0.5s ease;
-            }
-            
-            .assistant-ring {
-                position: absolute;
-                width: 260px;
-                height: 260px;
-                border-radius: 50%;
-                border: 2px solid rgba(64, 156, 255, 0.5);
-                box-shadow: 0 0 20px rgba(64, 156, 255, 0.3);
-                transition: box-shadow 0.5s ease;
-            }
-            
-            .assistant-center {
-                position: absolute;
-                width: 200px;
-                height: 200px;
-                border-radius: 50%;
-                background: radial-gradient(circle, rgba(13,35,67,0.8) 0%, rgba(7,18,34,0.6) 100%);
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                overflow: hidden;
-            }
-            
-            .assistant-animation {
-                width: 100%;
-                height: 100%;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-            }
-            
-            .status-text {
-                position: absolute;
-                bottom: -40px;
-                text-align: center;
-                font-size: 16px;
-                font-weight: 300;
-                color: rgba(255, 255, 255, 0.8);
-                text-transform: uppercase;
-                letter-spacing: 2px;
-            }
-            
-            .particles {
-                position: absolute;
-                width: 100%;
-                height: 100%;
-                pointer-events: none;
-            }
-            
-            .particle {
-                position: absolute;
-                background: rgba(64, 156, 255, 0.5);
-                border-radius: 50%;
-                pointer-events: none;
-            }
-            
-            /* Wave Animation */
-            .wave-container {
-                position: absolute;
-                width: 100%;
-                height: 100%;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                opacity: 0;
-                transition: opacity 0.5s ease;
-            }
-            
-            .wave {
-                position: absolute;
-                width: 160px;
-                height: 40px;
-                display: flex;
-                justify-content: center;
-            }
-            
-            .wave-bar {
-                background: linear-gradient(to top, #409cff, #7bbfff);
-                width: 6px;
-                height: 100%;
-                margin: 0 2px;
-                border-radius: 3px;
-                animation: wave 1.2s infinite ease-in-out;
-            }
-            
-            @keyframes wave {
-                0%, 100% { height: 10px; }
-                50% { height: 40px; }
-            }
-            
-            /* Orbit Animation */
-            .orbit-container {
-                position: absolute;
-                width: 100%;
-                height: 100%;
-                opacity: 0;
-                transition: opacity 0.5s ease;
-            }
-            
-            .orbit {
-                position: absolute;
-                border: 1px solid rgba(64, 156, 255, 0.3);
-                border-radius: 50%;
-            }
-            
-            .orbit-particle {
-                position: absolute;
-                width: 6px;
-                height: 6px;
-                background: #409cff;
-                border-radius: 50%;
-                box-shadow: 0 0 10px rgba(64, 156, 255, 0.8);
-            }
-            
-            /* Pulse Animation */
-            .pulse-container {
-                position: absolute;
-                width: 100%;
-                height: 100%;
-                opacity: 0;
-                transition: opacity 0.5s ease;
-            }
-            
-            .pulse-circle {
-                position: absolute;
-                border: 2px solid rgba(64, 156, 255, 0.5);
-                border-radius: 50%;
-                width: 60px;
-                height: 60px;
-                opacity: 0;
-                animation: pulse 2s infinite;
-            }
-            
-            @keyframes pulse {
-                0% { transform: scale(0.5); opacity: 0.8; }
-                100% { transform: scale(2); opacity: 0; }
-            }
-            
-            /* Alert indicators */
-            .alert-indicators {
-                position: absolute;
-                bottom: -70px;
-                left: 0;
-                right: 0;
-                display: flex;
-                justify-content: center;
-                gap: 20px;
-            }
-            
-            .alert-indicator {
-                width: 10px;
-                height: 10px;
-                border-radius: 50%;
-                background-color: #333;
-                transition: all 0.3s ease;
-            }
-            
-            .alert-indicator.active {
-                background-color: #f55;
-                box-shadow: 0 0 10px #f55;
-            }
-            
-            /* Info text */
-            .info-text {
-                margin-top: 100px;
-                text-align: center;
-                color: rgba(255, 255, 255, 0.6);
-                font-size: 14px;
-            }
-            
-            @keyframes rotate {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            
-            @keyframes orbit1 {
-                0% { transform: translate(60px, 0); }
-                100% { transform: translate(60px, 0) rotate(360deg); }
-            }
-            
-            @keyframes orbit2 {
-                0% { transform: translate(40px, 0) rotate(0deg); }
-                100% { transform: translate(40px, 0) rotate(-360deg); }
-            }
-            
-            @keyframes orbit3 {
-                0% { transform: translate(20px, 20px); }
-                100% { transform: translate(20px, 20px) rotate(360deg); }
-            }
-            
-            @keyframes float {
-                0%, 100% { transform: translateY(0) translateX(0); }
-                50% { transform: translateY(-10px) translateX(5px); }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="dashboard-container">
-            <div class="assistant-container">
-                <div class="assistant-background"></div>
-                <div class="assistant-ring"></div>
-                <div class="assistant-center">
-                    <div class="assistant-animation">
-                        <div class="particles" id="particles"></div>
-                        
-                        <!-- Speaking Animation -->
-                        <div class="wave-container" id="speaking-animation">
-                            <div class="wave">
-                                <div class="wave-bar" style="animation-delay: -1.2s"></div>
-                                <div class="wave-bar" style="animation-delay: -1.0s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.8s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.6s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.4s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.2s"></div>
-                                <div class="wave-bar" style="animation-delay: 0s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.2s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.4s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.6s"></div>
-                                <div class="wave-bar" style="animation-delay: -0.8s"></div>
-                                <div class="wave-bar" style="animation-delay: -1.0s"></div>
-                            </div>
-                        </div>
-                        
-                        <!-- Listening Animation -->
-                        <div class="orbit-container" id="listening-animation">
-                            <div class="orbit" style="width: 120px; height: 120px; animation: rotate 8s linear infinite"></div>
-                            <div class="orbit" style="width: 80px; height: 80px; animation: rotate 5s linear infinite reverse"></div>
-                            <div class="orbit-particle" style="animation: orbit1 8s linear infinite"></div>
-                            <div class="orbit-particle" style="animation: orbit2 5s linear infinite"></div>
-                            <div class="orbit-particle" style="animation: orbit3 3s linear infinite"></div>
-                        </div>
-                        
-                        <!-- Standby Animation -->
-                        <div class="pulse-container" id="standby-animation">
-                            <div class="pulse-circle" style="animation-delay: 0s"></div>
-                            <div class="pulse-circle" style="animation-delay: 0.6s"></div>
-                            <div class="pulse-circle" style="animation-delay: 1.2s"></div>
+# -------------------- DASHBOARD HTML --------------------
+DASHBOARD_HTML = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Sheero - Car Dashboard AI Assistant</title>
+    <style>
+        body {
+            margin: 0;
+            padding: 0;
+            background-color: #0a0b0c;
+            color: #fff;
+            font-family: 'Arial', sans-serif;
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            justify-content: center;
+            height: 100vh;
+            overflow: hidden;
+        }
+        
+        .dashboard-container {
+            width: 100%;
+            max-width: 800px;
+            position: relative;
+        }
+        
+        .assistant-container {
+            position: relative;
+            width: 320px;
+            height: 320px;
+            margin: 0 auto;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+        }
+        
+        .assistant-background {
+            position: absolute;
+            width: 100%;
+            height: 100%;
+            background: radial-gradient(circle, rgba(19,41,75,0.8) 0%, rgba(6,11,21,0.5) 100%);
+            border-radius: 50%;
+            box-shadow: 0 0 50px rgba(42, 95, 233, 0.3);
+            transition: box-shadow 0.5s ease;
+        }
+        
+        .assistant-ring {
+            position: absolute;
+            width: 260px;
+            height: 260px;
+            border-radius: 50%;
+            border: 2px solid rgba(64, 156, 255, 0.5);
+            box-shadow: 0 0 20px rgba(64, 156, 255, 0.3);
+            transition: box-shadow 0.5s ease;
+        }
+        
+        .assistant-center {
+            position: absolute;
+            width: 200px;
+            height: 200px;
+            border-radius: 50%;
+            background: radial-gradient(circle, rgba(13,35,67,0.8) 0%, rgba(7,18,34,0.6) 100%);
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            overflow: hidden;
+        }
+        
+        .assistant-animation {
+            width: 100%;
+            height: 100%;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+        }
+        
+        .status-text {
+            position: absolute;
+            bottom: -40px;
+            text-align: center;
+            font-size: 16px;
+            font-weight: 300;
+            color: rgba(255, 255, 255, 0.8);
+            text-transform: uppercase;
+            letter-spacing: 2px;
+        }
+        
+        .particles {
+            position: absolute;
+            width: 100%;
+            height: 100%;
+            pointer-events: none;
+        }
+        
+        .particle {
+            position: absolute;
+            background: rgba(64, 156, 255, 0.5);
+            border-radius: 50%;
+            pointer-events: none;
+        }
+        
+        /* Wave Animation */
+        .wave-container {
+            position: absolute;
+            width: 100%;
+            height: 100%;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            opacity: 0;
+            transition: opacity 0.5s ease;
+        }
+        
+        .wave {
+            position: absolute;
+            width: 160px;
+            height: 40px;
+            display: flex;
+            justify-content: center;
+        }
+        
+        .wave-bar {
+            background: linear-gradient(to top, #409cff, #7bbfff);
+            width: 6px;
+            height: 100%;
+            margin: 0 2px;
+            border-radius: 3px;
+            animation: wave 1.2s infinite ease-in-out;
+        }
+        
+        @keyframes wave {
+            0%, 100% { height: 10px; }
+            50% { height: 40px; }
+        }
+        
+        /* Orbit Animation */
+        .orbit-container {
+            position: absolute;
+            width: 100%;
+            height: 100%;
+            opacity: 0;
+            transition: opacity 0.5s ease;
+        }
+        
+        .orbit {
+            position: absolute;
+            border: 1px solid rgba(64, 156, 255, 0.3);
+            border-radius: 50%;
+        }
+        
+        .orbit-particle {
+            position: absolute;
+            width: 6px;
+            height: 6px;
+            background: #409cff;
+            border-radius: 50%;
+            box-shadow: 0 0 10px rgba(64, 156, 255, 0.8);
+        }
+        
+        /* Pulse Animation */
+        .pulse-container {
+            position: absolute;
+            width: 100%;
+            height: 100%;
+            opacity: 0;
+            transition: opacity 0.5s ease;
+        }
+        
+        .pulse-circle {
+            position: absolute;
+            border: 2px solid rgba(64, 156, 255, 0.5);
+            border-radius: 50%;
+            width: 60px;
+            height: 60px;
+            opacity: 0;
+            animation: pulse 2s infinite;
+        }
+        
+        @keyframes pulse {
+            0% { transform: scale(0.5); opacity: 0.8; }
+            100% { transform: scale(2); opacity: 0; }
+        }
+        
+        /* Alert indicators */
+        .alert-indicators {
+            position: absolute;
+            bottom: -70px;
+            left: 0;
+            right: 0;
+            display: flex;
+            justify-content: center;
+            gap: 20px;
+        }
+        
+        .alert-indicator {
+            width: 10px;
+            height: 10px;
+            border-radius: 50%;
+            background-color: #333;
+            transition: all 0.3s ease;
+        }
+        
+        .alert-indicator.active {
+            background-color: #f55;
+            box-shadow: 0 0 10px #f55;
+        }
+        
+        /* Info text */
+        .info-text {
+            margin-top: 100px;
+            text-align: center;
+            color: rgba(255, 255, 255, 0.6);
+            font-size: 14px;
+        }
+        
+        @keyframes rotate {
+            0% { transform: rotate(0deg); }
+            100% { transform: rotate(360deg); }
+        }
+        
+        @keyframes orbit1 {
+            0% { transform: translate(60px, 0); }
+            100% { transform: translate(60px, 0) rotate(360deg); }
+        }
+        
+        @keyframes orbit2 {
+            0% { transform: translate(40px, 0) rotate(0deg); }
+            100% { transform: translate(40px, 0) rotate(-360deg); }
+        }
+        
+        @keyframes orbit3 {
+            0% { transform: translate(20px, 20px); }
+            100% { transform: translate(20px, 20px) rotate(360deg); }
+        }
+        
+        @keyframes float {
+            0%, 100% { transform: translateY(0) translateX(0); }
+            50% { transform: translateY(-10px) translateX(5px); }
+        }
+    </style>
+</head>
+<body>
+    <div class="dashboard-container">
+        <div class="assistant-container">
+            <div class="assistant-background"></div>
+            <div class="assistant-ring"></div>
+            <div class="assistant-center">
+                <div class="assistant-animation">
+                    <div class="particles" id="particles"></div>
+                    
+                    <!-- Speaking Animation -->
+                    <div class="wave-container" id="speaking-animation">
+                        <div class="wave">
+                            <div class="wave-bar" style="animation-delay: -1.2s"></div>
+                            <div class="wave-bar" style="animation-delay: -1.0s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.8s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.6s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.4s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.2s"></div>
+                            <div class="wave-bar" style="animation-delay: 0s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.2s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.4s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.6s"></div>
+                            <div class="wave-bar" style="animation-delay: -0.8s"></div>
+                            <div class="wave-bar" style="animation-delay: -1.0s"></div>
                         </div>
                     </div>
-                </div>
-                <div class="status-text" id="status-text">Standby</div>
-                
-                <!-- Alert indicators -->
-                <div class="alert-indicators">
-                    <div class="alert-indicator" id="drowsy-indicator" title="Drowsiness Alert"></div>
-                    <div class="alert-indicator" id="drunk-indicator" title="Impairment Alert"></div>
-                    <div class="alert-indicator" id="stress-indicator" title="Stress Alert"></div>
+                    
+                    <!-- Listening Animation -->
+                    <div class="orbit-container" id="listening-animation">
+                        <div class="orbit" style="width: 120px; height: 120px; animation: rotate 8s linear infinite"></div>
+                        <div class="orbit" style="width: 80px; height: 80px; animation: rotate 5s linear infinite reverse"></div>
+                        <div class="orbit-particle" style="animation: orbit1 8s linear infinite"></div>
+                        <div class="orbit-particle" style="animation: orbit2 5s linear infinite"></div>
+                        <div class="orbit-particle" style="animation: orbit3 3s linear infinite"></div>
+                    </div>
+                    
+                    <!-- Standby Animation -->
+                    <div class="pulse-container" id="standby-animation">
+                        <div class="pulse-circle" style="animation-delay: 0s"></div>
+                        <div class="pulse-circle" style="animation-delay: 0.6s"></div>
+                        <div class="pulse-circle" style="animation-delay: 1.2s"></div>
+                    </div>
                 </div>
             </div>
+            <div class="status-text" id="status-text">Standby</div>
             
-            <div class="info-text">
-                Sheero AI Assistant | Say "gogi" to activate
+            <!-- Alert indicators -->
+            <div class="alert-indicators">
+                <div class="alert-indicator" id="drowsy-indicator" title="Drowsiness Alert"></div>
+                <div class="alert-indicator" id="drunk-indicator" title="Impairment Alert"></div>
+                <div class="alert-indicator" id="stress-indicator" title="Stress Alert"></div>
             </div>
         </div>
-
-        <script>
-            // Current animation state
-            let currentMode = 'standby';
-            
-            // Get animation elements
-            const speakingAnimation = document.getElementById('speaking-animation');
-            const listeningAnimation = document.getElementById('listening-animation');
-            const standbyAnimation = document.getElementById('standby-animation');
-            const statusText = document.getElementById('status-text');
-            const particles = document.getElementById('particles');
-            
-            // Get alert indicators
-            const drowsyIndicator = document.getElementById('drowsy-indicator');
-            const drunkIndicator = document.getElementById('drunk-indicator');
-            const stressIndicator = document.getElementById('stress-indicator');
+        
+        <div class="info-text">
+            Sheero AI Assistant | Say "gogi" to activate
+        </div>
+    </div>
+
+    <script>
+        // Current animation state
+        let currentMode = 'standby';
+        
+        // Get animation elements
+        const speakingAnimation = document.getElementById('speaking-animation');
+        const listeningAnimation = document.getElementById('listening-animation');
+        const standbyAnimation = document.getElementById('standby-animation');
+        const statusText = document.getElementById('status-text');
+        const particles = document.getElementById('particles');
+        
+        // Get alert indicators
+        const drowsyIndicator = document.getElementById('drowsy-indicator');
+        const drunkIndicator = document.getElementById('drunk-indicator');
+        const stressIndicator = document.getElementById('stress-indicator');
+        
+        // Set initial state
+        window.onload = function() {
+            createParticles();
+            setMode('standby');
             
-            // Set initial state
-            window.onload = function() {
-                createParticles();
-                setMode('standby');
+            // Subscribe to state updates
+            subscribeState();
+        };
+        
+        // Create background particles
+        function createParticles() {
+            for (let i = 0; i < 30; i++) {
+                const particle = document.createElement('div');
+                particle.classList.add('particle');
                 
-                // Start state polling
-                pollState();
-            };
+                // Random size
+                const size = Math.random() * 3 + 1;
+                particle.style.width = size + 'px';
+                particle.style.height = size + 'px';
+                
+                // Random position
+                const x = Math.random() * 100;
+                const y = Math.random() * 100;
+                particle.style.left = x + '%';
+                particle.style.top = y + '%';
+                
+                // Random opacity
+                particle.style.opacity = Math.random() * 0.5 + 0.2;
+                
+                // Animation
+                const duration = Math.random() * 5 + 5;
+                particle.style.animation = `float ${duration}s infinite ease-in-out`;
+                
+                particles.appendChild(particle);
+            }
+        }
+        
+        // Set animation mode
+        function setMode(mode) {
+            if (mode === currentMode) return;
             
-            // Create background particles
-            function createParticles() {
-                for (let i = 0; i < 30; i++) {
-                    const particle = document.createElement('div');
-                    particle.classList.add('particle');
-                    
-                    // Random size
-                    const size = Math.random() * 3 + 1;
-                    particle.style.width = size + 'px';
-                    particle.style.height = size + 'px';
-                    
-                    // Random position
-                    const x = Math.random() * 100;
-                    const y = Math.random() * 100;
-                    particle.style.left = x + '%';
-                    particle.style.top = y + '%';
+            // Hide all animations
+            speakingAnimation.style.opacity = '0';
+            listeningAnimation.style.opacity = '0';
+            standbyAnimation.style.opacity = '0';
+            
+            // Show selected animation
+            setTimeout(() => {
+                if (mode === 'speaking') {
+                    speakingAnimation.style.opacity = '1';
+                    statusText.textContent = 'Speaking';
                     
-                    // Random opacity
-                    particle.style.opacity = Math.random() * 0.5 + 0.2;
+                    // Add visual effects for speaking
+                    document.querySelector('.assistant-ring').style.boxShadow = '0 0 30px rgba(64, 156, 255, 0.5)';
+                    document.querySelector('.assistant-background').style.boxShadow = '0 0 60px rgba(42, 95, 233, 0.4)';
+                } 
+                else if (mode === 'listening') {
+                    listeningAnimation.style.opacity = '1';
+                    statusText.textContent = 'Listening';
                     
-                    // Animation
-                    const duration = Math.random() * 5 + 5;
-                    particle.style.animation = `float ${duration}s infinite ease-in-out`;
+                    // Add visual effects for listening
+                    document.querySelector('.assistant-ring').style.boxShadow = '0 0 30px rgba(64, 196, 255, 0.5)';
+                    document.querySelector('.assistant-background').style.boxShadow = '0 0 60px rgba(42, 165, 233, 0.4)';
+                } 
+                else {
+                    standbyAnimation.style.opacity = '1';
+                    statusText.textContent = 'Standby';
                     
-                    particles.appendChild(particle);
+                    // Reset visual effects
+                    document.querySelector('.assistant-ring').style.boxShadow = '0 0 20px rgba(64, 156, 255, 0.3)';
+                    document.querySelector('.assistant-background').style.boxShadow = '0 0 50px rgba(42, 95, 233, 0.3)';
                 }
-            }
-            
-            // Set animation mode
-            function setMode(mode) {
-                if (mode === currentMode) return;
                 
-                // Hide all animations
-                speakingAnimation.style.opacity = '0';
-                listeningAnimation.style.opacity = '0';
-                standbyAnimation.style.opacity = '0';
-                
-                // Show selected animation
-                setTimeout(() => {
-                    if (mode === 'speaking') {
-                        speakingAnimation.style.opacity = '1';
-                        statusText.textContent = 'Speaking';
-                        
-                        // Add visual effects for speaking
-                        document.querySelector('.assistant-ring').style.boxShadow = '0 0 30px rgba(64, 156, 255, 0.5)';
-                        document.querySelector('.assistant-background').style.boxShadow = '0 0 60px rgba(42, 95, 233, 0.4)';
-                    } 
-                    else if (mode === 'listening') {
-                        listeningAnimation.style.opacity = '1';
-                        statusText.textContent = 'Listening';
-                        
-                        // Add visual effects for listening
-                        document.querySelector('.assistant-ring').style.boxShadow = '0 0 30px rgba(64, 196, 255, 0.5)';
-                        document.querySelector('.assistant-background').style.boxShadow = '0 0 60px rgba(42, 165, 233, 0.4)';
-                    } 
-                    else {
-                        standbyAnimation.style.opacity = '1';
-                        statusText.textContent = 'Standby';
-                        
-                        // Reset visual effects
-                        document.querySelector('.assistant-ring').style.boxShadow = '0 0 20px rgba(64, 156, 255, 0.3)';
-                        document.querySelector('.assistant-background').style.boxShadow = '0 0 50px rgba(42, 95, 233, 0.3)';
-                    }
-                    
-                    currentMode = mode;
-                }, 300);
-            }
-            
-            // Set alert status
-            function setAlerts(alerts) {
-                drowsyIndicator.classList.toggle('active', alerts.drowsy);
-                drunkIndicator.classList.toggle('active', alerts.drunk);
-                stressIndicator.classList.toggle('active', alerts.stress);
-            }
-            
-            // Poll for state updates
-            function pollState() {
-                fetch('/state')
-                    .then(response => response.json())
-                    .then(data => {
-                        setMode(data.state);
-                        setAlerts(data.alert);
-                    })
-                    .catch(error => console.error('Error polling state:', error))
-                    .finally(() => {
-                        // Poll again after delay
-                        setTimeout(pollState, 500);
-                    });
-            }
-        </script>
-    </body>
-    </html>
-    """
-    
-    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates","dashboard.html"), "w") as f:
-        f.write(dashboard_html)
-    
-    log("Dashboard HTML file created")
+                currentMode = mode;
+            }, 300);
+        }
+        
+        // Set alert status
+        function setAlerts(alerts) {
+            drowsyIndicator.classList.toggle('active', alerts.drowsy);
+            drunkIndicator.classList.toggle('active', alerts.drunk);
+            stressIndicator.classList.toggle('active', alerts.stress);
+        }
+        
+        // Receive state updates pushed by the server
+        function subscribeState() {
+            const source = new EventSource('events');
+            source.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                setMode(data.state);
+                setAlerts(data.alert);
+            };
+            source.onerror = (error) => {
+                console.error('Error in state stream:', error);
+                // A busy server refuses the stream outright; try again later
+                if (source.readyState === EventSource.CLOSED) {
+                    setTimeout(subscribeState, 5000);
+                }
+            };
+        }
+    </script>
+</body>
+</html>
+"""
 
 # -------------------- API ENDPOINTS --------------------
-@api_app.route('/alert', methods=['POST'])
+@api_bp.route('/alert', methods=['POST'])
 def receive_alert():
     """Endpoint to receive alerts from the Driver Safety Suite"""
     try:
-        data = request.json
+        data = orjson.loads(request.get_data())
         alert_type = data.get('type')
         state = data.get('state', True)
         log(f"Received alert: {alert_type}, state: {state}")
@@ -654,100 +1063,231 @@ def receive_alert():
         # Update driver state and queue
         if alert_type in ["DROWSY", "DRUNK", "STRESS"]:
             driver_state[alert_type] = state
+            broadcast_state()
             if state:
-                driver_state["last_alerts"].append((time.time(), alert_type))
+                now = time.time()
+                last = driver_state["last_alerts"].last()
+                # Framewise classifiers re-fire the same alert many times a second
+                if not (last and last[1] == alert_type and now - last[0] < ALERT_DEDUP_WINDOW):
+                    driver_state["last_alerts"].append(now, alert_type)
                 alert_queue.put(alert_type)
 
-                # Immediately notify driver with a custom message
-                if alert_type == "DROWSY":
-                    speak("You seem a bit drowsy. Maybe pull over and rest.")
-                elif alert_type == "DRUNK":
-                    speak("You seem impaired. Consider stopping driving.")
-                elif alert_type == "STRESS":
-                    speak("You seem stressed. Take a moment to relax before continuing.")
+                # Immediately notify driver with a custom message, at most once per cooldown
+                if now - last_alert_spoken[alert_type] >= ALERT_TTS_COOLDOWN:
+                    last_alert_spoken[alert_type] = now
+                    speak(ALERT_PHRASES[alert_type])
 
         elif alert_type == "STEER":
             driver_state["STEER"] = data.get('direction', 'STRAIGHT')
 
         elif alert_type == "CRASH":
             driver_state["crash_detected"] = True
-            alert_queue.put("CRASH")
+            # Spoken here, not by alert_monitor, so an LLM stream there can't delay it
+            speak(ALERT_PHRASES["CRASH"])
 
-        return jsonify({"status": "success"})
+        return json_response({"status": "success"})
     except Exception as e:
         log(f"Error processing alert: {e}")
-        return jsonify({"status": "error", "message": str(e)}), 400
+        return json_response({"status": "error", "message": str(e)}, 400)
 
 # -------------------- DASHBOARD ENDPOINTS --------------------
-@dashboard_app.route('/')
+@dashboard_bp.route('/')
 def dashboard():
     """Serve the dashboard interface"""
-    return render_template('dashboard.html')
+    return Response(DASHBOARD_HTML, mimetype='text/html')
 
-@dashboard_app.route('/state')
+@dashboard_bp.route('/state')
 def get_state():
     """Return current assistant state"""
-    return jsonify({
-        "state": driver_state["assistant_state"],
-        "alert": {
-            "drowsy": driver_state["DROWSY"],
-            "drunk": driver_state["DRUNK"],
-            "stress": driver_state["STRESS"]
-        }
-    })
+    return Response(state_json, mimetype='application/json')
 
-@dashboard_app.route('/update_state', methods=['POST'])
-def update_state():
-    """Update the state from API server"""
-    try:
-        data = request.json
-        if 'state' in data:
-            driver_state["assistant_state"] = data["state"]
-        if 'alert' in data:
-            if 'drowsy' in data['alert']:
-                driver_state["DROWSY"] = data['alert']['drowsy']
-            if 'drunk' in data['alert']:
-                driver_state["DRUNK"] = data['alert']['drunk']
-            if 'stress' in data['alert']:
-                driver_state["STRESS"] = data['alert']['stress']
-        return jsonify({"status": "success"})
-    except Exception as e:
-        log(f"Error updating state: {e}")
-        return jsonify({"status": "error", "message": str(e)}), 400
+@dashboard_bp.route('/events')
+def state_events():
+    """Stream assistant state to the dashboard as server-sent events"""
+    # Each stream pins a server thread; refuse rather than starve /alert
+    if not event_stream_slots.acquire(blocking=False):
+        return json_response({"status": "error", "message": "Too many dashboard streams"}, 503)
+
+    def event_stream():
+        seen_version = None
+        while True:
+            with state_condition:
+                changed = state_condition.wait_for(lambda: state_version != seen_version, timeout=15)
+                seen_version = state_version
+                payload = state_json
+            if changed:
+                yield b"data: " + payload + b"\n\n"
+            else:
+                # Keep-alive comment so dead connections get noticed
+                yield b": keep-alive\n\n"
+    response = Response(stream_with_context(event_stream()), mimetype="text/event-stream")
+    response.call_on_close(event_stream_slots.release)
+    return response
 
 # -------------------- THREAD FUNCTIONS --------------------
 def tts_worker():
     """Thread to handle text-to-speech conversion using Google TTS"""
     global global_mic_active
     while True:
-        if not tts_queue.empty():
-            text = tts_queue.get()
-            log(f"Speaking: {text}")
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as f:
-                    filename = f.name
-                gTTS(text=text, lang=TTS_LANG).save(filename)
+        text, audio_future, played = tts_queue.get()
+        log(f"Speaking: {text}")
+        try:
+            audio = audio_future.result()
 
-                # Mute wake-word listener while speaking
-                global_mic_active = False
-                set_assistant_state("speaking")
+            # Mute wake-word listener while speaking
+            global_mic_active = False
+            set_assistant_state("speaking")
 
-                pygame.mixer.music.load(filename)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
+            play_sound(audio)
+
+            # Re-enable wake-word listener
+            global_mic_active = True
+            set_assistant_state("standby")
+        except Exception as e:
+            log(f"Error in TTS: {e}")
+            global_mic_active = True
+            set_assistant_state("standby")
+        finally:
+            played.set()
+
+def transcribe_speech(audio):
+    """Transcribe captured audio locally with faster-whisper"""
+    raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    # Background noise that tripped the energy threshold has nothing to transcribe
+    if not samples.size or np.sqrt(np.mean(samples * samples)) < SILENCE_RMS:
+        return ""
+    segments, _ = stt_model.transcribe(samples, language="en", beam_size=1, vad_filter=True)
+    return " ".join(segment.text.strip() for segment in segments).lower()
+
+class StreamMicrophone(sr.AudioSource):
+    """speech_recognition audio source backed by one long-lived sounddevice input stream
+
+    sr.Microphone reopens the audio device on every `with`, which is slow and
+    loses any speech that falls between two listen windows. This keeps the
+    device open for the life of the process and buffers blocks in a queue.
+    """
+    def __init__(self):
+        self.SAMPLE_RATE = SAMPLE_RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = BLOCK_SIZE
+        self.blocks = queue.Queue(maxsize=MIC_BUFFER_SECONDS * SAMPLE_RATE // BLOCK_SIZE)
+        self.input_stream = sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16',
+                                           blocksize=BLOCK_SIZE, callback=self.callback)
+        self.input_stream.start()
+        self.stream = self
+        self.tap = None  # Optional callable fed every block handed to the recognizer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def callback(self, indata, frames, time_info, status):
+        """sounddevice callback: queue one block of int16 samples, dropping the oldest when full"""
+        block = indata.tobytes()
+        try:
+            self.blocks.put_nowait(block)
+        except queue.Full:
+            try:
+                self.blocks.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.blocks.put_nowait(block)
+            except queue.Full:
+                pass
+
+    def read(self, size):
+        """Return the next buffered block (size is always CHUNK)"""
+        block = self.blocks.get()
+        if self.tap:
+            self.tap(block)
+        return block
+
+    def discard_buffered(self):
+        """Drop audio captured while the listener was muted"""
+        while True:
+            try:
+                self.blocks.get_nowait()
+            except queue.Empty:
+                return
 
-                # Re-enable wake-word listener
-                global_mic_active = True
-                set_assistant_state("standby")
+class KeywordSpotted(Exception):
+    """Raised from a StreamMicrophone tap to cut recognizer.listen short when a command model fires"""
+    def __init__(self, intent):
+        super().__init__(intent)
+        self.intent = intent
 
-                os.remove(filename)
-            except Exception as e:
-                log(f"Error in TTS: {e}")
-                global_mic_active = True
-                set_assistant_state("standby")
-        else:
-            time.sleep(0.1)
+class LocalWakeWordDetector:
+    """On-device keyword spotting: WebRTC VAD gate in front of openWakeWord models
+
+    Scores the wake word and any installed COMMAND_KEYWORD_MODELS together;
+    callers choose which of them may fire at each point in the conversation.
+    """
+    FRAME_SAMPLES = 1280  # openWakeWord scores 80ms frames
+
+    def __init__(self, wake_model_path, command_model_paths):
+        self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        # openWakeWord names each prediction after its model file
+        self.labels = {os.path.splitext(os.path.basename(wake_model_path))[0]: "wake"}
+        for intent, path in command_model_paths.items():
+            self.labels[os.path.splitext(os.path.basename(path))[0]] = intent
+        self.commands = frozenset(command_model_paths)
+        self.model = WakeWordModel(wakeword_models=[wake_model_path, *command_model_paths.values()],
+                                   inference_framework="onnx")
+        self.pending = b""
+
+    def process(self, block, intents=frozenset(["wake"])):
+        """Feed one mic block; return whichever of intents ("wake" or command intents) fired, or None"""
+        if not self.vad.is_speech(block, SAMPLE_RATE):
+            self.pending = b""
+            return None
+        self.pending += block
+        frame_bytes = self.FRAME_SAMPLES * 2
+        if len(self.pending) < frame_bytes:
+            return None
+        frame, self.pending = self.pending[:frame_bytes], self.pending[frame_bytes:]
+        scores = self.model.predict(np.frombuffer(frame, dtype=np.int16))
+        hits = [name for name, score in scores.items()
+                if score >= WAKE_WORD_THRESHOLD and self.labels[name] in intents]
+        if not hits:
+            return None
+        best = max(hits, key=scores.get)
+        # Clear the model's rolling buffer so one utterance fires only once
+        self.model.reset()
+        self.pending = b""
+        return self.labels[best]
+
+def handle_command_transcript(future):
+    """Queue a finished command transcription for command_processor"""
+    try:
+        command = future.result()
+    except Exception as e:
+        log(f"Error transcribing command: {e}")
+        speak("Speech service is unavailable right now.")
+        driver_state["conversation_active"] = False
+        return
+    if not command:
+        speak("Sorry, I didn't catch that.")
+        driver_state["conversation_active"] = False
+        return
+    log(f"Command: {command}")
+    speech_queue.put(command)
+
+def handle_wake_transcript(future):
+    """Check a finished wake-word transcription for WAKE_WORD"""
+    try:
+        text = future.result()
+    except Exception as e:
+        log(f"Error transcribing wake-word audio: {e}")
+        return
+    if not text:
+        return
+    log(f"Heard: {text}")
+    if WAKE_RE.search(text):
+        wake_event.set()
 
 def wake_word_detector():
     """Thread to continuously listen for WAKE_WORD, then capture one command."""
@@ -755,23 +1295,43 @@ def wake_word_detector():
     recognizer = sr.Recognizer()
     recognizer.dynamic_energy_threshold = True
 
-    # Ambient noise calibration
-    with sr.Microphone() as src:
-        recognizer.adjust_for_ambient_noise(src, duration=1)
-    log(f"Wake-word detector ready, listening for '{WAKE_WORD}'")
+    # Open the input device once and calibrate for ambient noise
+    mic = StreamMicrophone()
+    recognizer.adjust_for_ambient_noise(mic, duration=1)
+
+    local_detector = None
+    wake_transcription = None  # Future for the wake-word window being transcribed
+    if os.path.exists(WAKE_WORD_MODEL):
+        command_models = {intent: path for intent, path in COMMAND_KEYWORD_MODELS.items()
+                          if os.path.exists(path)}
+        try:
+            local_detector = LocalWakeWordDetector(WAKE_WORD_MODEL, command_models)
+        except Exception as e:
+            log(f"Error loading wake-word model, transcribing with faster-whisper instead: {e}")
+    else:
+        log(f"Wake-word model not found at {WAKE_WORD_MODEL}, transcribing with faster-whisper")
+    def spot_command(block):
+        """Microphone tap: stop the command capture as soon as a command model fires"""
+        intent = local_detector.process(block, local_detector.commands)
+        if intent:
+            raise KeywordSpotted(intent)
+
+    if local_detector:
+        if command_models:
+            log(f"Spotting commands on-device: {', '.join(command_models)}")
+        log(f"Wake-word detector ready, listening for '{WAKE_WORD}' on-device")
+    else:
+        log(f"Wake-word detector ready, listening for '{WAKE_WORD}'")
 
     while True:
         if not global_mic_active:
+            mic.discard_buffered()
             time.sleep(0.1)
             continue
 
         try:
-            with sr.Microphone() as src:
-                audio = recognizer.listen(src, timeout=2, phrase_time_limit=2)
-            text = recognizer.recognize_google(audio).lower()
-            log(f"Heard: {text}")
-
-            if WAKE_WORD in text:
+            if wake_event.is_set():
+                wake_event.clear()
                 log("Wake word detected!")
 
                 # 1) Mute listener
@@ -785,30 +1345,57 @@ def wake_word_detector():
                 # 3) Wait for TTS to finish (tts_worker will re-enable mic)
                 while not global_mic_active:
                     time.sleep(0.1)
+                mic.discard_buffered()
                 
                 # Reset state to listening
                 set_assistant_state("listening")
 
-                # 4) Listen once for the actual user command
-                with sr.Microphone() as cmd_src:
+                # 4) Listen once for the actual user command; fixed commands
+                #    are spotted on-device and skip transcription entirely
+                if local_detector and local_detector.commands:
+                    mic.tap = spot_command
+                try:
                     cmd_audio = recognizer.listen(
-                        cmd_src,
+                        mic,
                         timeout=LISTENING_TIMEOUT,
                         phrase_time_limit=LISTENING_TIMEOUT
                     )
-                try:
-                    command = recognizer.recognize_google(cmd_audio).lower()
-                    log(f"Command: {command}")
-                    speech_queue.put(command)
-                except sr.UnknownValueError:
-                    speak("Sorry, I didn't catch that.")
-                except sr.RequestError:
-                    speak("Speech service is unavailable right now.")
+                except KeywordSpotted as hit:
+                    log(f"Command keyword detected: {hit.intent}")
+                    wake_event.clear()
+                    run_command(hit.intent)
+                    continue
+                except sr.WaitTimeoutError:
+                    log("No command heard")
+                    driver_state["conversation_active"] = False
+                    set_assistant_state("standby")
+                    wake_event.clear()
+                    continue
+                finally:
+                    mic.tap = None
+                # Transcribe off-thread and go straight back to wake-word listening
+                command_stt_pool.submit(transcribe_speech, cmd_audio).add_done_callback(handle_command_transcript)
+
+                # Drop wake words transcribed from audio captured before the conversation
+                wake_event.clear()
+                continue
+
+            if local_detector:
+                # Commands only count after the wake word, so chatter can't trigger them
+                if local_detector.process(mic.read(mic.CHUNK)) == "wake":
+                    wake_event.set()
+                continue
+
+            audio = recognizer.listen(mic, timeout=2, phrase_time_limit=2)
+            # Keep listening while this window is transcribed, but drop new
+            # windows until it finishes so a noisy cabin can't build a backlog
+            if wake_transcription and not wake_transcription.done():
+                continue
+            wake_transcription = stt_pool.submit(transcribe_speech, audio)
+            wake_transcription.add_done_callback(handle_wake_transcript)
 
         except sr.WaitTimeoutError:
             continue
-        except sr.UnknownValueError:
-            continue
         except Exception as e:
             log(f"Unexpected error in wake-word detector: {e}")
             time.sleep(1)   
@@ -816,118 +1403,146 @@ def wake_word_detector():
 def command_processor():
     """Process spoken commands from the user"""
     while True:
-        if not speech_queue.empty():
-            command = speech_queue.get()
-            log(f"Processing command: {command}")
-
-            system_prompt = """
-            You are an AI driving assistant. You should:
-            1. Provide helpful, concise responses to the driver's queries
-            2. Prioritize the driver's safety above all else
-            3. Suggest actions that keep the driver's attention on the road
-            4. Keep responses brief (1-3 sentences when possible)
-            """
-
-            if "play" in command and any(w in command for w in ["calm", "relaxing", "music"]):
-                play_calm_music()
-            elif "stop" in command and "listening" in command:
-                speak("Voice assistant deactivated. Say gogi to reactivate.")
-                driver_state["conversation_active"] = False
-            elif "weather" in command:
-                speak("Currently 36 degrees Celcius in okhla new delhi with sunny skies, expected to hit 40 degrees celcius at peak.")
-            elif "distance" in command:
-                speak("You are about 20 kilometers far from your destination, estimated time remaining is 45 minutes")
-            elif "music" in command:
-                speak("Now playing on spotify")
-            
-            else:
-                response = query_ollama(command, system_prompt=system_prompt)
-                speak(response)
-
-            driver_state["conversation_active"] = False
-        else:
-            time.sleep(0.1)
-
+        command = speech_queue.get()
+        log(f"Processing command: {command}")
 
-def alert_monitor():
-    """Monitor and respond to queued driver safety alerts"""
-    while True:
-        if not alert_queue.empty():
-            alert = alert_queue.get()
-            log(f"Processing alert: {alert}")
+        match = COMMAND_RE.search(command)
+        run_command(match.lastgroup if match else None, command)
 
-            if alert == "CRASH":
-                speak("I've detected a possible collision. Are you okay? Please respond or I'll call emergency services.")
-                continue
+def run_command(intent, command=None):
+    """Carry out a command intent, asking the LLM when there is no fixed intent"""
+    if intent == "calm":
+        play_calm_music()
+    elif intent == "stop":
+        speak("Voice assistant deactivated. Say gogi to reactivate.")
+    elif intent in COMMAND_RESPONSES:
+        speak(COMMAND_RESPONSES[intent])
+    else:
+        for sentence in query_ollama_stream(command, system_prompt=SYSTEM_PROMPT):
+            speak(sentence)
 
-            if driver_state["conversation_active"]:
-                continue
+    driver_state["conversation_active"] = False
 
-            if check_alert_threshold():
-                prompt = get_driver_assistance_prompt()
-                if prompt:
-                    suggestion = query_ollama(prompt)
-                    speak(suggestion)
-                    driver_state["last_suggestion"] = time.time()
 
-        time.sleep(5)
-        if not driver_state["continuous_monitoring"]:
+def alert_monitor():
+    """Respond to queued driver safety alerts and run the periodic check"""
+    next_check = time.monotonic() + MONITOR_INTERVAL
+    while True:
+        # Block for the first alert or until the periodic check is due, then
+        # take everything else already queued so a burst costs one threshold
+        # check and at most one LLM call
+        timeout = next_check - time.monotonic()
+        if timeout <= 0:
+            next_check = time.monotonic() + MONITOR_INTERVAL
+            continuous_monitor()
             continue
-        if all(not driver_state[s] for s in ["DROWSY", "DRUNK", "STRESS", "crash_detected", "conversation_active"]):
+        try:
+            pending = {alert_queue.get(timeout=timeout)}
+        except queue.Empty:
             continue
-        now = time.time()
-        if now - driver_state["last_suggestion"] >= driver_state["suggestion_cooldown"]:
-            prompt = get_driver_assistance_prompt()
-            if prompt:
-                suggestion = query_ollama(prompt)
-                speak(suggestion)
-                driver_state["last_suggestion"] = now
+        while True:
+            try:
+                pending.add(alert_queue.get_nowait())
+            except queue.Empty:
+                break
+        log(f"Processing alerts: {', '.join(sorted(pending))}")
 
-def start_api_server():
-    """Start the Flask server to receive alerts"""
-    api_app.run(host='0.0.0.0', port=FLASK_PORT)
+        if driver_state["conversation_active"]:
+            continue
 
-def start_dashboard_server():
-    dashboard_app.run(host='0.0.0.0', port=DASHBOARD_PORT)
+        if check_alert_threshold():
+            prompt = get_driver_assistance_prompt()
+            if prompt:
+                for sentence in query_ollama_cached(prompt, max_tokens=ASSIST_MAX_TOKENS, stop=ASSIST_STOP):
+                    speak(sentence)
+                driver_state["last_suggestion"] = time.time()
+
+def continuous_monitor():
+    """Offer a suggestion if the driver still shows warning signs"""
+    if not driver_state["continuous_monitoring"]:
+        return
+    if not (driver_state["DROWSY"] or driver_state["DRUNK"] or driver_state["STRESS"]
+            or driver_state["crash_detected"] or driver_state["conversation_active"]):
+        return
+    now = time.time()
+    if now - driver_state["last_suggestion"] >= driver_state["suggestion_cooldown"]:
+        prompt = get_driver_assistance_prompt()
+        if prompt:
+            for sentence in query_ollama_cached(prompt, max_tokens=ASSIST_MAX_TOKENS, stop=ASSIST_STOP):
+                speak(sentence)
+            driver_state["last_suggestion"] = now
+
+def create_app():
+    """Build the Flask app serving the alert API and the dashboard"""
+    app = Flask("sheero", static_folder=STATIC_DIR)
+    # The Driver Safety Suite posts to /alert, so the API stays at the root
+    app.register_blueprint(api_bp)
+    app.register_blueprint(dashboard_bp, url_prefix="/dashboard")
+    return app
+
+def start_server():
+    """Start the Flask server for alerts and the dashboard"""
+    serve(create_app(), host='0.0.0.0', port=FLASK_PORT, threads=SERVER_THREADS)
 
 # -------------------- MAIN FUNCTION --------------------
-def main():
-    setup_dashboard_files()
-    log("Starting Smart Driver AI Assistant")
+def check_ollama():
+    """Warn if Ollama is unreachable or MODEL_NAME has not been pulled"""
     try:
-        response = requests.get("http://localhost:11434/api/tags")
-        models = response.json().get("models", [])
+        response = http_session.get(f"{OLLAMA_HOST}/api/tags", timeout=OLLAMA_PROBE_TIMEOUT)
+        models = orjson.loads(response.content).get("models", [])
         if not any(m["name"] == MODEL_NAME for m in models):
             log(f"Warning: {MODEL_NAME} model not found in Ollama. Install it with:")
             log(f"  ollama pull {MODEL_NAME}")
-    except:
+    except Exception:
         log("Warning: Could not connect to Ollama. Make sure it's running on port 11434")
 
+def main():
+    broadcast_state()  # Publish the initial state snapshot
+    log("Starting Smart Driver AI Assistant")
+
+    # Probe Ollama while the worker threads start instead of before them
+    startup_pool = ThreadPoolExecutor(max_workers=1)
+    ollama_probe = startup_pool.submit(check_ollama)
+    startup_pool.shutdown(wait=False)
+
+    signal.signal(signal.SIGTERM, lambda *_: shutdown.set())
+
     try:
         speak("Assistant starting up.")
+        # Keep the audio path on its own cores so frames stay cache-hot
         threads = [
-            threading.Thread(target=tts_worker, daemon=True),
-            threading.Thread(target=wake_word_detector, daemon=True),
-            threading.Thread(target=command_processor, daemon=True),
-            threading.Thread(target=alert_monitor, daemon=True),
-            threading.Thread(target=start_api_server, daemon=True),
-            threading.Thread(target=start_dashboard_server, daemon=True),
+            (threading.Thread(target=tts_worker, name="tts_worker", daemon=True), AUDIO_CPUS, AUDIO_NICE),
+            (threading.Thread(target=prewarm_tts_cache, name="prewarm_tts_cache", daemon=True), WORKER_CPUS, None),
+            (threading.Thread(target=wake_word_detector, name="wake_word_detector", daemon=True), AUDIO_CPUS, AUDIO_NICE),
+            (threading.Thread(target=command_processor, name="command_processor", daemon=True), WORKER_CPUS, None),
+            (threading.Thread(target=alert_monitor, name="alert_monitor", daemon=True), WORKER_CPUS, None),
+            (threading.Thread(target=start_server, name="start_server", daemon=True), WORKER_CPUS, None),
         ]
-        for t in threads:
+        for t, cpus, nice in threads:
             t.start()
+            pin_thread(t.native_id, cpus, nice)
 
         time.sleep(1)
+        ollama_probe.result()
         log("All systems initialized. Assistant is running.")
+        log(f"Dashboard available at http://localhost:{FLASK_PORT}/dashboard/")
 
-        while True:
-            time.sleep(1)
+        # Sleep until SIGTERM; Ctrl-C still raises KeyboardInterrupt
+        shutdown.wait()
 
     except KeyboardInterrupt:
-        log("Shutting down assistant")
-        speak("Assistant shutting down. Drive safely.")
+        pass
     except Exception as e:
         log(f"Error in main thread: {e}")
         import traceback; traceback.print_exc()
+        return
+
+    log("Shutting down assistant")
+    # tts_worker is a daemon thread, so give the goodbye time to play before exiting
+    speak("Assistant shutting down. Drive safely.").wait(SHUTDOWN_SPEECH_TIMEOUT)
+    # The pools' threads are joined at exit; don't start work nobody will hear
+    for pool in (tts_pool, stt_pool, command_stt_pool):
+        pool.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     main()